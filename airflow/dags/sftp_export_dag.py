@@ -139,9 +139,17 @@ def resolve_placeholders(
     )
 
 
+def get_default_compression(format: str) -> str:
+    """Get default compression for an export format (AVRO uses block-level SNAPPY)."""
+    return "SNAPPY" if format.upper() == "AVRO" else "GZIP"
+
+
 def get_file_extension(format: str, compression: str) -> str:
     """Get file extension based on format and compression."""
     ext = format.lower()
+    if format.upper() == "AVRO":
+        # AVRO compression is applied inside the container, not to the whole file
+        return ext
     if compression.upper() == "GZIP":
         ext += ".gz"
     elif compression.upper() == "SNAPPY":
@@ -162,13 +170,19 @@ def build_export_query(
     # Filename pattern: {export_name}_{date}-{shard}.{extension} (final format, no rename needed)
     gcs_uri = f"gs://{gcs_bucket}/{export_name}/{folder_date}/{export_name}_{folder_date}-*.{extension}"
 
+    options = [
+        f"uri='{gcs_uri}'",
+        f"format='{format}'",
+        f"compression='{compression}'",
+        "overwrite=true",
+    ]
+    # header and field_delimiter are only valid for CSV exports
+    if format.upper() == "CSV":
+        options += ["header=true", "field_delimiter='|'"]
+
+    options_sql = ",\n    ".join(options)
     return f"""EXPORT DATA OPTIONS(
-    uri='{gcs_uri}',
-    format='{format}',
-    compression='{compression}',
-    overwrite=true,
-    header=true,
-    field_delimiter='|'
+    {options_sql}
 ) AS
 {query}"""
 
@@ -270,21 +284,29 @@ def sftp_export():
             folder_date = data_interval_end.strftime("%Y%m%d")
 
             # Build EXPORT DATA statement
+            export_format = export_config.get("format", "CSV")
             export_sql = build_export_query(
                 query=resolved_query,
                 gcs_bucket=gcs_bucket,
                 export_name=export_name,
                 folder_date=folder_date,
-                format=export_config.get("format", "CSV"),
-                compression=export_config.get("compression", "GZIP"),
+                format=export_format,
+                compression=export_config.get("compression", get_default_compression(export_format)),
             )
 
             print(f"Resolved query (with placeholders replaced):\n{resolved_query}")
             print(f"Full EXPORT DATA statement:\n{export_sql}")
 
-            # Execute using BigQuery hook
+            # Execute using BigQuery hook. BATCH priority runs large exports on idle
+            # slots; the label makes per-export cost visible in billing.
             hook = BigQueryHook(gcp_conn_id="google_cloud_default", use_legacy_sql=False)
-            hook.run_query(sql=export_sql, use_legacy_sql=False)
+            hook.run_query(
+                sql=export_sql,
+                use_legacy_sql=False,
+                priority=export_config.get("priority", "INTERACTIVE").upper(),
+                labels={"export_name": export_name.lower()[:63]},
+                maximum_bytes_billed=export_config.get("maximum_bytes_billed"),
+            )
 
             gcs_path = f"gs://{gcs_bucket}/{export_name}/{folder_date}/"
             print(f"Export complete. Files at: {gcs_path}")
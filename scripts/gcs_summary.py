@@ -21,19 +21,22 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 
-# Load .env file (but preserve existing GOOGLE_APPLICATION_CREDENTIALS to use gcloud auth)
-from dotenv import load_dotenv
-_gcp_creds = os.environ.get("GOOGLE_APPLICATION_CREDENTIALS")
-load_dotenv(Path(__file__).parent.parent / ".env")
-if _gcp_creds:
-    os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = _gcp_creds
-elif "GOOGLE_APPLICATION_CREDENTIALS" in os.environ:
-    # Remove invalid key from .env, use gcloud default instead
-    del os.environ["GOOGLE_APPLICATION_CREDENTIALS"]
-
 from google.cloud import storage
 
 
+def load_env() -> None:
+    """Load .env file (but preserve existing GOOGLE_APPLICATION_CREDENTIALS to use gcloud auth)."""
+    from dotenv import load_dotenv
+
+    gcp_creds = os.environ.get("GOOGLE_APPLICATION_CREDENTIALS")
+    load_dotenv(Path(__file__).parent.parent / ".env")
+    if gcp_creds:
+        os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = gcp_creds
+    elif "GOOGLE_APPLICATION_CREDENTIALS" in os.environ:
+        # Remove invalid key from .env, use gcloud default instead
+        del os.environ["GOOGLE_APPLICATION_CREDENTIALS"]
+
+
 def format_size(size_bytes: int) -> str:
     """Format bytes into human readable string."""
     for unit in ["B", "KB", "MB", "GB", "TB"]:
@@ -236,6 +239,9 @@ def _print_table(summaries: Dict[str, Any]) -> None:
 
 
 def main():
+    # Load before building the parser, whose defaults come from the environment
+    load_env()
+
     parser = argparse.ArgumentParser(description="GCS/SFTP export summary")
     
     # GCS options
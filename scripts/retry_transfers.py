@@ -4,21 +4,12 @@ Retry SFTP transfers for missing files identified by failed_transfers.py
 """
 
 import argparse
-import json
-import os
-from typing import Any, Dict, List
+from typing import Any, Dict
 
-from src.helpers import cprint
+from src.config import load_config
 from src.sftp import upload_from_gcs
 
 
-def load_config(config_path: str) -> Dict[str, Any]:
-    """Load configuration from a JSON file."""
-    with open(config_path, "r") as f:
-        config = json.load(f)
-    return config
-
-
 def retry_transfers(sftp_config: Dict[str, Any], missing_files_path: str, sftp_directory: str):
     """Retry transferring files that were missed."""
     print(f"Loading missing files list from {missing_files_path}")
@@ -59,6 +59,24 @@ def resolve_placeholders(
     return query
 
 
+def get_default_compression(format: str) -> str:
+    """Get default compression for an export format (AVRO uses block-level SNAPPY)."""
+    return "SNAPPY" if format.upper() == "AVRO" else "GZIP"
+
+
+def get_file_extension(format: str, compression: str) -> str:
+    """Get file extension based on format and compression."""
+    ext = format.lower()
+    if format.upper() == "AVRO":
+        # AVRO compression is applied inside the container, not to the whole file
+        return ext
+    if compression.upper() == "GZIP":
+        ext += ".gz"
+    elif compression.upper() == "SNAPPY":
+        ext += ".snappy"
+    return ext
+
+
 def build_export_query(
     query: str,
     gcs_bucket: str,
@@ -70,22 +88,23 @@ def build_export_query(
 ) -> str:
     """Build a BigQuery EXPORT DATA statement."""
     # Build GCS URI pattern
-    extension = format.lower()
-    if compression.upper() == "GZIP":
-        extension += ".gz"
-    elif compression.upper() == "SNAPPY":
-        extension += ".snappy"
-
+    extension = get_file_extension(format, compression)
     gcs_uri = f"gs://{gcs_bucket}/{export_name}/{ds_nodash}/{export_name}_{ds_nodash}-*.{extension}"
 
+    options = [
+        f"uri='{gcs_uri}'",
+        f"format='{format}'",
+        f"compression='{compression}'",
+        f"overwrite={str(overwrite).lower()}",
+    ]
+    # header and field_delimiter are only valid for CSV exports
+    if format.upper() == "CSV":
+        options += ["header=true", "field_delimiter='|'"]
+
     # Build EXPORT DATA statement
+    options_sql = ",\n    ".join(options)
     export_sql = f"""EXPORT DATA OPTIONS(
-    uri='{gcs_uri}',
-    format='{format}',
-    compression='{compression}',
-    overwrite={str(overwrite).lower()},
-    header=true,
-    field_delimiter='|'
+    {options_sql}
 ) AS
 {query}"""
     return export_sql
@@ -199,27 +218,22 @@ Examples:
 
     # Parse dates
     if args.date:
-        base_date = datetime.strptime(args.date, "%Y-%m-%d")
+        base_date = datetime.fromisoformat(args.date)
     else:
         base_date = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
 
     ds = base_date.strftime("%Y-%m-%d")
     ds_nodash = base_date.strftime("%Y%m%d")
 
-    # Parse interval (for queries that use data_interval_start/end)
+    # Parse interval (for queries that use data_interval_start/end);
+    # fromisoformat accepts both "YYYY-MM-DD" and "YYYY-MM-DD HH:MM:SS"
     if args.start:
-        try:
-            data_interval_start = datetime.strptime(args.start, "%Y-%m-%d %H:%M:%S")
-        except ValueError:
-            data_interval_start = datetime.strptime(args.start, "%Y-%m-%d")
+        data_interval_start = datetime.fromisoformat(args.start)
     else:
         data_interval_start = base_date
 
     if args.end:
-        try:
-            data_interval_end = datetime.strptime(args.end, "%Y-%m-%d %H:%M:%S")
-        except ValueError:
-            data_interval_end = datetime.strptime(args.end, "%Y-%m-%d")
+        data_interval_end = datetime.fromisoformat(args.end)
     else:
         data_interval_end = data_interval_start + timedelta(days=1)
 
@@ -242,13 +256,14 @@ Examples:
     )
 
     # Build full export query
+    export_format = export_config.get("format", "CSV")
     query = build_export_query(
         query=resolved_query,
         gcs_bucket=gcs_bucket,
         export_name=args.export,
         ds_nodash=ds_nodash,
-        format=export_config.get("format", "CSV"),
-        compression=export_config.get("compression", "GZIP"),
+        format=export_format,
+        compression=export_config.get("compression", get_default_compression(export_format)),
     )
 
     print(f"\nGenerated EXPORT DATA query:\n")
@@ -60,7 +60,7 @@ def test_bq_export(export_name: str, date: str, config_path: str = "configs/expo
     gcs_bucket = config["gcs_bucket"]
 
     # Parse date
-    dt = datetime.strptime(date, "%Y-%m-%d")
+    dt = datetime.fromisoformat(date)
     ds = dt.strftime("%Y-%m-%d")
     ds_nodash = dt.strftime("%Y%m%d")
     data_interval_start = dt
@@ -306,7 +306,7 @@ def test_full_pipeline(export_name: str, date: str, config_path: str = "configs/
         config = json.load(f)
 
     gcs_bucket = config["gcs_bucket"]
-    ds_nodash = datetime.strptime(date, "%Y-%m-%d").strftime("%Y%m%d")
+    ds_nodash = datetime.fromisoformat(date).strftime("%Y%m%d")
     gcs_path = f"gs://{gcs_bucket}/{export_name}/{ds_nodash}/"
 
     # Step 1: BQ Export
@@ -9,16 +9,40 @@ import os
 
 from flask import Flask, jsonify, request
 
-from src.config import load_config
+from src.config import get_config
 from src.helpers import cprint
 from src.transfer import transfer_gcs_to_sftp
 
 app = Flask(__name__)
 
-# Load config once at startup
+# Config is loaded on first request and cached while its sources are unchanged
 CONFIG_PATH = os.environ.get("CONFIG_PATH", "configs/exports.json")
 
 
+def _parse_export_request(missing_message=None):
+    """
+    Parse the JSON payload shared by /transfer and /verify.
+
+    Args:
+        missing_message: Error message for a missing field; defaults to
+            naming the missing field
+
+    Returns:
+        (data, None) when the payload has export_name and gcs_path, otherwise
+        (None, (response, 400)) to return to the caller
+    """
+    data = request.get_json()
+    if not data:
+        return None, (jsonify({"status": "error", "message": "No JSON payload"}), 400)
+
+    for field in ("export_name", "gcs_path"):
+        if not data.get(field):
+            message = missing_message or f"Missing {field}"
+            return None, (jsonify({"status": "error", "message": message}), 400)
+
+    return data, None
+
+
 @app.route("/transfer", methods=["POST"])
 def handle_transfer():
     """
@@ -41,19 +65,14 @@ def handle_transfer():
     }
     """
     try:
-        data = request.get_json()
-        if not data:
-            return jsonify({"status": "error", "message": "No JSON payload"}), 400
+        data, error = _parse_export_request()
+        if error:
+            return error
 
-        export_name = data.get("export_name")
-        gcs_path = data.get("gcs_path")
+        export_name = data["export_name"]
+        gcs_path = data["gcs_path"]
         export_date = data.get("date", datetime.date.today().isoformat())
 
-        if not export_name:
-            return jsonify({"status": "error", "message": "Missing export_name"}), 400
-        if not gcs_path:
-            return jsonify({"status": "error", "message": "Missing gcs_path"}), 400
-
         cprint(
             f"Received transfer request",
             severity="INFO",
@@ -63,7 +82,7 @@ def handle_transfer():
         )
 
         # Load config and execute transfer
-        config = load_config(CONFIG_PATH)
+        config = get_config(CONFIG_PATH)
         result = transfer_gcs_to_sftp(
             sftp_config=config["sftp"],
             gcs_path=gcs_path,
@@ -104,17 +123,14 @@ def handle_verify():
     }
     """
     try:
-        data = request.get_json()
-        if not data:
-            return jsonify({"status": "error", "message": "No JSON payload"}), 400
-
-        export_name = data.get("export_name")
-        gcs_path = data.get("gcs_path")
+        data, error = _parse_export_request("Missing export_name or gcs_path")
+        if error:
+            return error
 
-        if not export_name or not gcs_path:
-            return jsonify({"status": "error", "message": "Missing export_name or gcs_path"}), 400
+        export_name = data["export_name"]
+        gcs_path = data["gcs_path"]
 
-        config = load_config(CONFIG_PATH)
+        config = get_config(CONFIG_PATH)
 
         from src.verify import verify_gcs_sftp_sync
 
@@ -139,7 +155,7 @@ def health_check():
         jsonify(
             {
                 "status": "healthy",
-                "timestamp": datetime.datetime.now().isoformat(),
+                "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
                 "config_path": CONFIG_PATH,
             }
         ),
@@ -4,9 +4,38 @@ Configuration loading and validation for GCS→SFTP export service.
 
 import json
 import os
-from typing import Any, Dict, Optional
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Optional, Tuple
 
-from src.helpers import cprint
+from src.helpers import cprint, json_loads
+
+# Defaults for the env-var-only config; values are overlaid by _merge_env_overrides
+_DEFAULT_CONFIG = MappingProxyType(
+    {
+        "sftp": MappingProxyType({"port": 22, "directory": "/"}),
+        "gcs": MappingProxyType({"expiration_days": 30}),
+    }
+)
+
+_REQUIRED_SFTP_KEYS = ("host", "username", "password", "directory")
+
+# Env var overrides as (env var, config key, cast), applied by _merge_env_overrides
+_SFTP_ENV_KEYS: Tuple[Tuple[str, str, Callable[[str], Any]], ...] = (
+    ("SFTP_HOST", "host", str),
+    ("SFTP_PORT", "port", int),
+    ("SFTP_USERNAME", "username", str),
+    ("SFTP_PASSWORD", "password", str),
+    ("SFTP_DIRECTORY", "directory", str),
+)
+_GCS_ENV_KEYS: Tuple[Tuple[str, str, Callable[[str], Any]], ...] = (
+    ("GCS_BUCKET", "bucket", str),
+    ("GCS_EXPIRATION_DAYS", "expiration_days", int),
+)
+
+# Environment variables that load_config reads; part of the get_config cache key
+_CONFIG_ENV_VARS = ("EXPORT_CONFIG",) + tuple(env_key for env_key, _, _ in _SFTP_ENV_KEYS + _GCS_ENV_KEYS)
+
+_CONFIG_CACHE: Dict[Tuple, Dict[str, Any]] = {}
 
 
 class ConfigError(Exception):
@@ -34,7 +63,7 @@ def load_config(config_path: Optional[str] = None) -> Dict[str, Any]:
         if os.path.exists(config_path):
             try:
                 with open(config_path, "r") as f:
-                    config = json.load(f)
+                    config = json_loads(f.read())
                     cprint(f"Loaded config from file", severity="INFO", path=config_path)
             except Exception as e:
                 raise ConfigError(f"Failed to load config file '{config_path}': {str(e)}")
@@ -46,28 +75,16 @@ def load_config(config_path: Optional[str] = None) -> Dict[str, Any]:
         config_json = os.environ.get("EXPORT_CONFIG")
         if config_json:
             try:
-                config = json.loads(config_json)
+                config = json_loads(config_json)
                 cprint("Loaded config from EXPORT_CONFIG env var", severity="INFO")
             except json.JSONDecodeError as e:
                 raise ConfigError(f"Invalid JSON in EXPORT_CONFIG environment variable: {e}")
     
     # Priority 3: Individual environment variables (minimal config)
     if config is None:
-        sftp_host = os.environ.get("SFTP_HOST")
-        if sftp_host:
-            config = {
-                "sftp": {
-                    "host": sftp_host,
-                    "port": int(os.environ.get("SFTP_PORT", "22")),
-                    "username": os.environ.get("SFTP_USERNAME"),
-                    "password": os.environ.get("SFTP_PASSWORD"),
-                    "directory": os.environ.get("SFTP_DIRECTORY", "/"),
-                },
-                "gcs": {
-                    "bucket": os.environ.get("GCS_BUCKET"),
-                    "expiration_days": int(os.environ.get("GCS_EXPIRATION_DAYS", "30")),
-                },
-            }
+        if os.environ.get("SFTP_HOST"):
+            # Start from the frozen defaults; SFTP_*/GCS_* values are applied below
+            config = {section: dict(values) for section, values in _DEFAULT_CONFIG.items()}
             cprint("Loaded config from individual env vars", severity="INFO")
         else:
             raise ConfigError(
@@ -83,37 +100,53 @@ def load_config(config_path: Optional[str] = None) -> Dict[str, Any]:
     return config
 
 
+def get_config(config_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Load configuration, reusing the last result while its sources are unchanged.
+
+    The cache key covers the config file's modification time and every
+    environment variable load_config reads, so warm requests skip parsing
+    and validation. The returned dict is shared and must not be mutated.
+
+    Args:
+        config_path: Optional path to JSON config file
+
+    Returns:
+        Dictionary with configuration
+
+    Raises:
+        ConfigError: If configuration is invalid or missing required fields
+    """
+    mtime = os.path.getmtime(config_path) if config_path and os.path.exists(config_path) else None
+    key = (config_path, mtime, tuple(os.environ.get(var) for var in _CONFIG_ENV_VARS))
+
+    config = _CONFIG_CACHE.get(key)
+    if config is None:
+        config = load_config(config_path)
+        # Only the latest sources matter; drop stale entries
+        _CONFIG_CACHE.clear()
+        _CONFIG_CACHE[key] = config
+    return config
+
+
 def _merge_env_overrides(config: Dict[str, Any]) -> Dict[str, Any]:
     """Merge environment variable overrides into config."""
-    # Ensure sftp section exists
-    if "sftp" not in config:
-        config["sftp"] = {}
-    
-    # SFTP overrides from env vars
-    env_overrides = {
-        "host": os.environ.get("SFTP_HOST"),
-        "port": os.environ.get("SFTP_PORT"),
-        "username": os.environ.get("SFTP_USERNAME"),
-        "password": os.environ.get("SFTP_PASSWORD"),
-        "directory": os.environ.get("SFTP_DIRECTORY"),
-    }
-    
-    for key, value in env_overrides.items():
+    env = os.environ
+
+    # SFTP overrides from env vars; set-but-empty values still override
+    sftp = config.setdefault("sftp", {})
+    for env_key, key, cast in _SFTP_ENV_KEYS:
+        value = env.get(env_key)
         if value is not None:
-            if key == "port":
-                config["sftp"][key] = int(value)
-            else:
-                config["sftp"][key] = value
-    
-    # GCS overrides
-    if "gcs" not in config:
-        config["gcs"] = {}
-    
-    if os.environ.get("GCS_BUCKET"):
-        config["gcs"]["bucket"] = os.environ.get("GCS_BUCKET")
-    if os.environ.get("GCS_EXPIRATION_DAYS"):
-        config["gcs"]["expiration_days"] = int(os.environ.get("GCS_EXPIRATION_DAYS"))
-    
+            sftp[key] = cast(value)
+
+    # GCS overrides; empty values are ignored
+    gcs = config.setdefault("gcs", {})
+    for env_key, key, cast in _GCS_ENV_KEYS:
+        value = env.get(env_key)
+        if value:
+            gcs[key] = cast(value)
+
     return config
 
 
@@ -123,9 +156,10 @@ def _validate_config(config: Dict[str, Any]) -> None:
     if "sftp" not in config or not isinstance(config["sftp"], dict):
         raise ConfigError("Missing 'sftp' configuration section")
 
-    required_sftp = ["host", "username", "password", "directory"]
-    missing = [k for k in required_sftp if not config["sftp"].get(k)]
-    if missing:
+    sftp = config["sftp"]
+    if not all(sftp.get(k) for k in _REQUIRED_SFTP_KEYS):
+        # Only build the full list when there is an error to report
+        missing = [k for k in _REQUIRED_SFTP_KEYS if not sftp.get(k)]
         raise ConfigError(f"Missing required SFTP configuration: {', '.join(missing)}")
 
     # GCS configuration is optional but has defaults
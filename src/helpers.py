@@ -3,23 +3,82 @@ Helper functions used throughout the BigQuery to SFTP export project.
 """
 
 import json
-from datetime import datetime
-from typing import Any, Dict
+import os
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, Union
+
+if TYPE_CHECKING:
+    from google.cloud import storage
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+def json_dumps(obj: Any) -> str:
+    """Serialize obj to a JSON string, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+
+def json_loads(data: Union[str, bytes]) -> Any:
+    """
+    Parse a JSON document, using orjson when it is installed.
+
+    Raises:
+        json.JSONDecodeError: If data is not valid JSON (orjson's error subclasses it)
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+_SEVERITY_LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40, "CRITICAL": 50}
+
+# Minimum severity cprint emits, read once at import (LOG_LEVEL env var)
+_MIN_SEVERITY = _SEVERITY_LEVELS.get(os.environ.get("LOG_LEVEL", "DEBUG").upper(), 10)
 
 
 def cprint(message: str, severity: str = "DEBUG", **kwargs: Any) -> None:
     """
     Cloud logging wrapper with timestamp and structured output.
 
+    Entries below the LOG_LEVEL threshold are dropped before any formatting.
+
     Args:
         message: Main log message
         severity: Log level (DEBUG, INFO, WARNING, ERROR), defaults to DEBUG
         **kwargs: Additional fields to include in log entry
     """
+    severity = severity.upper()
+    if _SEVERITY_LEVELS.get(severity, _MIN_SEVERITY) < _MIN_SEVERITY:
+        return
+
     entry: Dict[str, Any] = {
-        "timestamp": datetime.now().isoformat(),
-        "severity": severity.upper(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "severity": severity,
         "message": message,
         **kwargs,
     }
-    print(json.dumps(entry))
+    print(json_dumps(entry))
+
+
+@lru_cache(maxsize=1)
+def get_storage_client() -> "storage.Client":
+    """
+    Get a process-wide GCS client.
+
+    The client is created on first use and reused by later requests, so
+    warm instances keep their credentials and HTTP connection pool.
+
+    Returns:
+        Shared google.cloud.storage client
+    """
+    # Imported here so modules that only need logging/config (src.config,
+    # the scripts) don't pay for loading the storage library
+    from google.cloud import storage
+
+    return storage.Client()
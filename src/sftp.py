@@ -3,19 +3,37 @@ SFTP operations for the export function.
 Handles connecting to SFTP and uploading files.
 """
 
+import base64
 import concurrent.futures
 import os
-import tempfile
+import stat
+import threading
 import time
+import weakref
+from contextlib import contextmanager, nullcontext
 from pathlib import PurePosixPath
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 
+import google_crc32c
 import paramiko
 from google.cloud import storage
 from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 
 from src.config import ConfigError
-from src.helpers import cprint
+from src.helpers import cprint, get_storage_client
+
+# Blob bytes fetched per GCS range request while streaming. Smaller than the
+# library's 40 MiB default so the first SFTP write starts sooner and memory
+# per concurrent upload stays bounded.
+_GCS_READ_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Bytes handed to each SFTP write; paramiko splits these into pipelined requests
+_SFTP_WRITE_CHUNK_SIZE = 1024 * 1024
+
+# Directories known to exist on the server, per SFTP connection; an entry is
+# dropped when its client is garbage collected
+_KNOWN_DIRS: "weakref.WeakKeyDictionary[paramiko.SFTPClient, Set[str]]" = weakref.WeakKeyDictionary()
+_KNOWN_DIRS_LOCK = threading.Lock()
 
 
 def parse_gcs_uri(gcs_uri: str) -> Tuple[str, str]:
@@ -35,30 +53,33 @@ def parse_gcs_uri(gcs_uri: str) -> Tuple[str, str]:
     if not gcs_uri.startswith("gs://"):
         raise ValueError(f"Invalid GCS URI: {gcs_uri}")
 
-    # Remove gs:// prefix and split
-    path = gcs_uri[5:]
-    parts = path.split("/", 1)
+    # Remove gs:// prefix and split on the first slash
+    bucket_name, sep, blob_name = gcs_uri[5:].partition("/")
 
-    if len(parts) != 2:
+    if not sep:
         raise ValueError(f"Invalid GCS URI format: {gcs_uri}")
 
-    return parts[0], parts[1]  # bucket_name, blob_name
+    return bucket_name, blob_name
 
 
-def upload_from_gcs(sftp_config: Dict[str, Any], gcs_uri: str, remote_filename: str) -> None:
+def upload_from_gcs(
+    sftp_config: Dict[str, Any],
+    gcs_uri: str,
+    remote_filename: str,
+    sftp_client: Optional[paramiko.SFTPClient] = None,
+) -> None:
     """
-    Upload a file from GCS to SFTP server using download-upload method.
+    Upload a file from GCS to SFTP server by streaming the blob.
 
     Args:
         sftp_config: Dictionary with SFTP connection parameters
         gcs_uri: GCS URI of the file to upload
         remote_filename: Filename to use on SFTP server
+        sftp_client: Optional open SFTP client to upload over; the caller keeps
+            ownership and it is not closed here
     """
     # Extract common parameters
     host = sftp_config["host"]
-    port = int(sftp_config.get("port", 22))
-    username = sftp_config["username"]
-    password = sftp_config["password"]
     directory = sftp_config["directory"]
 
     # Use PurePosixPath for SFTP paths (always Unix-style)
@@ -76,7 +97,7 @@ def upload_from_gcs(sftp_config: Dict[str, Any], gcs_uri: str, remote_filename:
     try:
         start_time = time.time()
         bucket_name, blob_name = parse_gcs_uri(gcs_uri)
-        storage_client = storage.Client()
+        storage_client = get_storage_client()
         bucket = storage_client.bucket(bucket_name)
         blob = bucket.get_blob(blob_name)
 
@@ -87,26 +108,20 @@ def upload_from_gcs(sftp_config: Dict[str, Any], gcs_uri: str, remote_filename:
         blob_size = blob.size
         cprint(f"File located in GCS", file_size=f"{blob_size / (1024*1024):.2f} MB")
 
-        # Connect to SFTP
-        cprint(f"Connecting to SFTP server at {host}:{port}", severity="INFO")
-        transport, sftp = create_sftp_connection(host, port, username, password)
-
-        # Create directories if needed
-        ensure_sftp_directory(sftp, remote_path)
+        # Connect to SFTP unless the caller already has a session
+        session = sftp_session(sftp_config) if sftp_client is None else nullcontext(sftp_client)
+        with session as sftp:
+            # Create directories if needed
+            ensure_sftp_directory(sftp, remote_path)
 
-        # Use download-upload method
-        cprint("Using download-upload method", severity="INFO")
-        transfer_start = time.time()
-        _download_and_upload(sftp, blob, str(remote_file_path))
+            # Stream the blob to SFTP
+            transfer_start = time.time()
+            _download_and_upload(sftp, blob, str(remote_file_path))
 
         # Calculate total transfer time
         transfer_time = time.time() - transfer_start
         total_time = time.time() - start_time
 
-        # Close connection
-        sftp.close()
-        transport.close()
-
         cprint(
             f"Upload completed successfully",
             severity="INFO",
@@ -126,6 +141,7 @@ def upload_from_gcs(sftp_config: Dict[str, Any], gcs_uri: str, remote_filename:
 def upload_from_gcs_sequential(
     sftp_config: Dict[str, Any],
     file_mappings: List[Tuple[str, str]],
+    sftp_client: Optional[paramiko.SFTPClient] = None,
 ) -> int:
     """
     Upload multiple files from GCS to SFTP using a single persistent connection.
@@ -134,6 +150,8 @@ def upload_from_gcs_sequential(
     Args:
         sftp_config: SFTP connection configuration
         file_mappings: List of (gcs_uri, remote_filename) tuples
+        sftp_client: Optional open SFTP client to upload over; the caller keeps
+            ownership and it is not closed here
 
     Returns:
         int: Number of files successfully transferred
@@ -145,10 +163,6 @@ def upload_from_gcs_sequential(
         cprint("No files to transfer", severity="WARNING")
         return 0
 
-    host = sftp_config["host"]
-    port = int(sftp_config.get("port", 22))
-    username = sftp_config["username"]
-    password = sftp_config["password"]
     directory = sftp_config["directory"]
 
     total_files = len(file_mappings)
@@ -156,18 +170,17 @@ def upload_from_gcs_sequential(
 
     cprint(f"Starting sequential upload of {total_files} files (single connection)", severity="INFO")
 
-    # Create single SFTP connection
-    transport, sftp = create_sftp_connection(host, port, username, password)
-
-    # Ensure target directory exists
-    remote_path = PurePosixPath(directory)
-    ensure_sftp_directory(sftp, remote_path)
+    # Create single SFTP connection unless the caller already has one
+    session = sftp_session(sftp_config) if sftp_client is None else nullcontext(sftp_client)
+    with session as sftp:
+        # Ensure target directory exists
+        remote_path = PurePosixPath(directory)
+        ensure_sftp_directory(sftp, remote_path)
 
-    # Initialize GCS client once
-    storage_client = storage.Client()
-    transferred = 0
+        # Shared GCS client
+        storage_client = get_storage_client()
+        transferred = 0
 
-    try:
         for idx, (gcs_uri, remote_filename) in enumerate(file_mappings):
             file_start = time.time()
             remote_file_path = remote_path / remote_filename
@@ -199,37 +212,35 @@ def upload_from_gcs_sequential(
                     severity="ERROR",
                     time_taken=f"{file_time:.2f}s",
                 )
-                # Close connection and raise - don't continue with partial transfers
-                sftp.close()
-                transport.close()
+                # Raise - don't continue with partial transfers
                 raise Exception(f"Transfer failed on file {idx+1}/{total_files} ({remote_filename}): {str(e)}")
 
-        total_time = time.time() - start_time
-        cprint(
-            f"Sequential upload complete: {transferred}/{total_files} files transferred",
-            severity="INFO",
-            total_time=f"{total_time:.2f}s",
-        )
-
-        return transferred
+    total_time = time.time() - start_time
+    cprint(
+        f"Sequential upload complete: {transferred}/{total_files} files transferred",
+        severity="INFO",
+        total_time=f"{total_time:.2f}s",
+    )
 
-    finally:
-        # Ensure connection is closed
-        try:
-            sftp.close()
-            transport.close()
-        except Exception:
-            pass
+    return transferred
 
 
 def upload_from_gcs_parallel(
     sftp_config: Dict[str, Any],
     file_mappings: List[Tuple[str, str]],
     max_workers: int = None,
+    sftp_client: Optional[paramiko.SFTPClient] = None,
 ) -> int:
     """
     Upload multiple files from GCS to SFTP server in parallel.
-    Each worker thread creates its own SFTP connection.
+    Each worker thread opens one SFTP connection and reuses it for every
+    file it uploads; all connections are closed once the batch finishes.
+    After a failed upload the worker drops its session, in case the
+    connection died, and reconnects for its next file.
+    A caller-supplied client is used by the first worker instead of opening
+    a connection, so the batch never holds more than max_workers sessions.
+    The first failed file fails the batch: uploads that have not started are
+    cancelled, the ones already running finish, and the error is raised.
     
     WARNING: May cause connection limit issues on some SFTP servers.
     Consider using upload_from_gcs_sequential() for more reliability.
@@ -238,12 +249,14 @@ def upload_from_gcs_parallel(
         sftp_config: SFTP connection configuration
         file_mappings: List of (gcs_uri, remote_filename) tuples
         max_workers: Maximum number of concurrent workers
+        sftp_client: Optional open SFTP client for one of the workers; the
+            caller keeps ownership and it is not closed here
 
     Returns:
         int: Number of files successfully transferred
 
     Raises:
-        Exception: If any file fails to transfer
+        Exception: If any file fails to transfer (the first failure)
     """
     if not file_mappings:
         cprint("No files to transfer", severity="WARNING")
@@ -255,23 +268,57 @@ def upload_from_gcs_parallel(
 
     total_files = len(file_mappings)
     successful_files = []
-    failed = 0
     start_time = time.time()
 
     cprint(f"Starting parallel upload of {total_files} files with {max_workers} workers", severity="INFO")
 
-    # Create a copy of the config for each worker
+    host = sftp_config["host"]
+    port = int(sftp_config.get("port", 22))
+    username = sftp_config["username"]
+    password = sftp_config["password"]
+
+    # One session per worker thread, opened on its first file
+    worker_state = threading.local()
+    sessions: List[Tuple[paramiko.Transport, paramiko.SFTPClient]] = []
+    sessions_lock = threading.Lock()
+    spare_clients = [sftp_client] if sftp_client is not None else []
+
+    def worker_sftp() -> paramiko.SFTPClient:
+        sftp = getattr(worker_state, "sftp", None)
+        if sftp is None:
+            # The transport is only kept for sessions opened here; a spare
+            # client belongs to the caller
+            transport = None
+            with sessions_lock:
+                sftp = spare_clients.pop() if spare_clients else None
+            if sftp is None:
+                # Connect outside the lock so workers handshake concurrently
+                transport, sftp = create_sftp_connection(host, port, username, password)
+                with sessions_lock:
+                    sessions.append((transport, sftp))
+            worker_state.sftp = sftp
+            worker_state.transport = transport
+        return sftp
+
+    def drop_worker_sftp() -> None:
+        """Forget this worker's session so its next file reconnects."""
+        sftp = getattr(worker_state, "sftp", None)
+        transport = getattr(worker_state, "transport", None)
+        worker_state.sftp = worker_state.transport = None
+        if transport is not None:
+            with sessions_lock:
+                sessions.remove((transport, sftp))
+            sftp.close()
+            transport.close()
+
     def upload_file(args):
         """Worker function that handles a single file transfer"""
         idx, (gcs_uri, remote_filename) = args
         file_start = time.time()
 
         try:
-            # Create a deep copy of the config for each thread
-            thread_config = sftp_config.copy()
-
-            # Upload the file using existing function (creates its own connection)
-            upload_from_gcs(thread_config, gcs_uri, remote_filename)
+            # Upload the file over this worker's session
+            upload_from_gcs(sftp_config, gcs_uri, remote_filename, sftp_client=worker_sftp())
 
             file_time = time.time() - file_start
             cprint(
@@ -282,13 +329,15 @@ def upload_from_gcs_parallel(
             return remote_filename  # Return filename on success
 
         except Exception as e:
+            # The session may be dead; don't let later files retry over it
+            drop_worker_sftp()
             file_time = time.time() - file_start
             cprint(
                 f"File {idx+1}/{total_files}: {remote_filename} transfer failed: {str(e)}",
                 severity="ERROR",
                 time_taken=f"{file_time:.2f}s",
             )
-            return None  # Return None on failure
+            raise Exception(f"Transfer failed on file {idx+1}/{total_files} ({remote_filename}): {str(e)}")
 
     try:
         # Process files with ThreadPoolExecutor
@@ -300,16 +349,18 @@ def upload_from_gcs_parallel(
 
             # Process results as they complete
             for future in concurrent.futures.as_completed(future_to_file):
-                result = future.result()
-                if result is not None:
-                    successful_files.append(result)
-                else:
-                    failed += 1
+                try:
+                    successful_files.append(future.result())
+                except Exception:
+                    # The transfer fails either way, so don't start the
+                    # remaining uploads; running ones finish on executor exit
+                    cancelled = sum(f.cancel() for f in future_to_file)
+                    cprint(f"Cancelled {cancelled} pending uploads after a failure", severity="WARNING")
+                    raise
 
                 # Report progress
-                completed = len(successful_files) + failed
                 cprint(
-                    f"Progress: {completed}/{total_files} files processed ({len(successful_files)} successful, {failed} failed)",
+                    f"Progress: {len(successful_files)}/{total_files} files transferred",
                     severity="DEBUG",
                 )
 
@@ -317,27 +368,29 @@ def upload_from_gcs_parallel(
         cprint(
             f"Parallel upload complete: {len(successful_files)}/{total_files} files transferred",
             severity="INFO",
-            failed=failed,
             total_time=f"{total_time:.2f}s",
         )
 
-        # Fail if any files failed to transfer
-        if failed > 0:
-            raise Exception(f"Transfer failed: {failed}/{total_files} files failed to upload")
-
         return len(successful_files)
 
     except Exception as e:
         cprint(f"Parallel upload operation failed: {str(e)}", severity="ERROR")
         raise
 
+    finally:
+        for transport, sftp in sessions:
+            sftp.close()
+            transport.close()
+
 
 def ensure_sftp_directory(sftp: paramiko.SFTPClient, remote_path: PurePosixPath) -> None:
     """
     Create directory tree if it doesn't exist.
 
-    This function checks if a directory exists on the SFTP server and creates
-    it recursively if it does not exist.
+    Directories that were found or created are remembered for the connection,
+    so later uploads into the same directory skip the check entirely. Missing
+    directories are created bottom-up: mkdir is tried on the target first and
+    only walks up to parents the server reports as missing.
 
     Args:
         sftp: Paramiko SFTP client connected to the server
@@ -346,21 +399,39 @@ def ensure_sftp_directory(sftp: paramiko.SFTPClient, remote_path: PurePosixPath)
     Returns:
         None
     """
+    with _KNOWN_DIRS_LOCK:
+        known = _KNOWN_DIRS.setdefault(sftp, set())
+    if str(remote_path) in known:
+        return
+
     try:
         sftp.stat(str(remote_path))
         cprint(f"Directory {remote_path} exists")
     except FileNotFoundError:
         cprint(f"Creating directory path: {remote_path}")
+        _make_sftp_dirs(sftp, remote_path)
 
-        # Create directories recursively using pathlib
-        current = PurePosixPath("/")
-        for part in remote_path.parts[1:]:  # Skip the first empty part from root
-            current = current / part
-            try:
-                sftp.stat(str(current))
-            except FileNotFoundError:
-                cprint(f"Creating directory: {current}")
-                sftp.mkdir(str(current))
+    # The parents of an existing directory exist as well
+    known.update(str(path) for path in (remote_path, *remote_path.parents))
+
+
+def _make_sftp_dirs(sftp: paramiko.SFTPClient, remote_path: PurePosixPath, create_parents: bool = True) -> None:
+    """Create remote_path, creating missing parents first unless create_parents is False."""
+    cprint(f"Creating directory: {remote_path}")
+    try:
+        sftp.mkdir(str(remote_path))
+    except FileNotFoundError:
+        # The parent is missing too; create it, then retry once
+        if not create_parents or remote_path.parent == remote_path:
+            raise
+        _make_sftp_dirs(sftp, remote_path.parent)
+        _make_sftp_dirs(sftp, remote_path, create_parents=False)
+    except IOError:
+        # Servers usually report an existing directory as a generic failure;
+        # another connection may have created it since the caller's stat
+        mode = sftp.stat(str(remote_path)).st_mode
+        if mode is None or not stat.S_ISDIR(mode):
+            raise
 
 
 @retry(
@@ -375,12 +446,14 @@ def ensure_sftp_directory(sftp: paramiko.SFTPClient, remote_path: PurePosixPath)
 )
 def _download_and_upload(sftp: paramiko.SFTPClient, blob: storage.Blob, remote_file_path: str) -> None:
     """
-    Two-step process: Download to temp file then upload to SFTP.
+    Stream a GCS blob straight into a file on the SFTP server.
 
-    This method first downloads the GCS blob to a local temporary file,
-    then uploads that file to the SFTP server using paramiko's optimized
-    put() method. This approach is generally faster for small to medium
-    sized files than streaming.
+    The blob is read in chunks and each chunk is written to the remote file
+    as it arrives, so the download and upload overlap and nothing is staged
+    on local disk. Writes are pipelined so several SFTP WRITE requests are in
+    flight at once instead of waiting for each acknowledgement. A CRC32C of
+    the bytes is computed as they pass through and compared with the blob's
+    checksum, since streamed reads are not verified by the storage library.
 
     Args:
         sftp: Paramiko SFTP client connected to the server
@@ -390,58 +463,40 @@ def _download_and_upload(sftp: paramiko.SFTPClient, blob: storage.Blob, remote_f
     Returns:
         None
 
-    Note:
-        The temporary file is automatically cleaned up after the upload
-        completes or if an error occurs.
+    Raises:
+        IOError: If the uploaded file size or checksum does not match the blob
     """
     overall_start = time.time()
-    temp_file = tempfile.NamedTemporaryFile(delete=False)
-    temp_path = temp_file.name
-    temp_file.close()  # Close but don't delete
 
-    try:
-        # Step 1: Download
-        cprint(f"Starting download from GCS", severity="INFO")
-        download_start = time.time()
-        blob.download_to_filename(temp_path)
-        download_time = time.time() - download_start
-        file_size = os.path.getsize(temp_path)
-
-        download_rate = file_size / download_time / 1024 / 1024 if download_time > 0 else 0
-        cprint(
-            f"GCS download completed",
-            severity="INFO",
-            size=f"{file_size/1024/1024:.2f} MB",
-            time=f"{download_time:.2f}s",
-            rate=f"{download_rate:.2f} MB/s",
-        )
+    cprint(f"Starting streaming transfer from GCS", severity="INFO", destination=remote_file_path)
+    checksum = google_crc32c.Checksum()
+    with blob.open("rb", chunk_size=_GCS_READ_CHUNK_SIZE) as src, sftp.open(remote_file_path, "wb") as dst:
+        dst.set_pipelined(True)
+        while chunk := src.read(_SFTP_WRITE_CHUNK_SIZE):
+            checksum.update(chunk)
+            dst.write(chunk)
 
-        # Step 2: SFTP upload
-        cprint(f"Starting SFTP upload", severity="INFO", destination=remote_file_path)
-        upload_start = time.time()
-        sftp.put(temp_path, remote_file_path)
-        upload_time = time.time() - upload_start
+    # Confirm the upload like sftp.put() does
+    file_size = sftp.stat(remote_file_path).st_size
+    if blob.size is not None and file_size != blob.size:
+        raise IOError(f"Size mismatch for {remote_file_path}: GCS {blob.size} bytes, SFTP {file_size} bytes")
 
-        # Calculate metrics
-        upload_rate = file_size / upload_time / 1024 / 1024 if upload_time > 0 else 0
-        total_time = time.time() - overall_start
+    # GCS reports crc32c as base64 of the big-endian checksum
+    crc32c = base64.b64encode(checksum.digest()).decode()
+    if blob.crc32c is not None and crc32c != blob.crc32c:
+        raise IOError(f"CRC32C mismatch for {remote_file_path}: GCS {blob.crc32c}, streamed {crc32c}")
 
-        # Log completion with detailed metrics
-        cprint(
-            f"SFTP upload completed",
-            severity="INFO",
-            upload_time=f"{upload_time:.2f}s",
-            upload_rate=f"{upload_rate:.2f} MB/s",
-            download_time=f"{download_time:.2f}s",
-            download_rate=f"{download_rate:.2f} MB/s",
-            total_time=f"{total_time:.2f}s",
-        )
+    total_time = time.time() - overall_start
+    rate = file_size / total_time / 1024 / 1024 if total_time > 0 else 0
 
-    finally:
-        # Clean up temp file
-        if os.path.exists(temp_path):
-            os.unlink(temp_path)
-            cprint("Temporary file removed")
+    # Log completion with detailed metrics
+    cprint(
+        f"SFTP upload completed",
+        severity="INFO",
+        size=f"{file_size/1024/1024:.2f} MB",
+        total_time=f"{total_time:.2f}s",
+        rate=f"{rate:.2f} MB/s",
+    )
 
 
 def check_sftp_credentials(sftp_config: Dict[str, Any], timeout: int = 10) -> bool:
@@ -455,6 +510,30 @@ def check_sftp_credentials(sftp_config: Dict[str, Any], timeout: int = 10) -> bo
     Returns:
         bool: True if connection is successful
 
+    Raises:
+        ConfigError: If connection fails
+    """
+    with checked_sftp_session(sftp_config, timeout=timeout):
+        return True
+
+
+@contextmanager
+def checked_sftp_session(sftp_config: Dict[str, Any], timeout: int = 10) -> Iterator[paramiko.SFTPClient]:
+    """
+    Open an SFTP session, verify the credentials on it, and keep it open.
+
+    Connecting, logging in and listing the target directory are all covered by
+    the credential check, so a bad host or login is logged with the connection
+    details and raised as ConfigError. Errors raised inside the with-block are
+    not converted.
+
+    Args:
+        sftp_config: Dictionary with SFTP connection parameters
+        timeout: Connection timeout in seconds
+
+    Yields:
+        Connected paramiko SFTP client, closed along with its transport on exit
+
     Raises:
         ConfigError: If connection fails
     """
@@ -476,26 +555,23 @@ def check_sftp_credentials(sftp_config: Dict[str, Any], timeout: int = 10) -> bo
 
     # Create a "transport" directly (lower level than SSHClient)
     try:
-        # Create transport
         transport, sftp = create_sftp_connection(host, port, username, password)
-
-        # Try listing directory
         try:
-            cprint(f"Checking directory access")
-            files = sftp.listdir(remote_path)
-            cprint(f"Directory access confirmed", file_count=len(files), directory=remote_path)
-        except FileNotFoundError:
-            cprint(
-                f"Directory does not exist, will be created during upload", severity="WARNING", directory=remote_path
-            )
-
-        # Clean up
-        sftp.close()
-        transport.close()
-
-        elapsed = time.time() - start_time
-        cprint(f"SFTP credentials verified in {elapsed:.2f}s", severity="INFO")
-        return True
+            # Try listing directory
+            try:
+                cprint(f"Checking directory access")
+                files = sftp.listdir(remote_path)
+                cprint(f"Directory access confirmed", file_count=len(files), directory=remote_path)
+            except FileNotFoundError:
+                cprint(
+                    f"Directory does not exist, will be created during upload",
+                    severity="WARNING",
+                    directory=remote_path,
+                )
+        except Exception:
+            sftp.close()
+            transport.close()
+            raise
 
     except Exception as e:
         elapsed = time.time() - start_time
@@ -503,6 +579,15 @@ def check_sftp_credentials(sftp_config: Dict[str, Any], timeout: int = 10) -> bo
         cprint(error_message, severity="ERROR", host=host, port=port, username=username)
         raise ConfigError(error_message)
 
+    elapsed = time.time() - start_time
+    cprint(f"SFTP credentials verified in {elapsed:.2f}s", severity="INFO")
+
+    try:
+        yield sftp
+    finally:
+        sftp.close()
+        transport.close()
+
 
 @retry(
     stop=stop_after_attempt(5),
@@ -523,6 +608,30 @@ def create_sftp_connection(host: str, port: int, username: str, password: str):
     return transport, sftp
 
 
+@contextmanager
+def sftp_session(sftp_config: Dict[str, Any]) -> Iterator[paramiko.SFTPClient]:
+    """
+    Open an SFTP session for the duration of a with-block.
+
+    Args:
+        sftp_config: Dictionary with SFTP connection parameters
+
+    Yields:
+        Connected paramiko SFTP client, closed along with its transport on exit
+    """
+    transport, sftp = create_sftp_connection(
+        sftp_config["host"],
+        int(sftp_config.get("port", 22)),
+        sftp_config["username"],
+        sftp_config["password"],
+    )
+    try:
+        yield sftp
+    finally:
+        sftp.close()
+        transport.close()
+
+
 def list_sftp_files(sftp_config: Dict[str, Any], directory: str) -> Dict[str, Dict[str, Any]]:
     """
     List files in an SFTP directory with their metadata.
@@ -581,7 +690,6 @@ def list_sftp_directory(sftp_config: Dict[str, Any], directory: str, long_format
     Returns:
         List of entries with metadata
     """
-    import stat
     from datetime import datetime
 
     host = sftp_config["host"]
@@ -624,7 +732,6 @@ def list_sftp_tree(sftp_config: Dict[str, Any], directory: str, max_depth: int =
         directory: Root directory to start from
         max_depth: Maximum depth to traverse
     """
-    import stat
 
     host = sftp_config["host"]
     port = int(sftp_config.get("port", 22))
@@ -688,7 +795,6 @@ def delete_sftp_path(sftp_config: Dict[str, Any], path: str, recursive: bool = F
     Returns:
         Tuple of (files_deleted, dirs_deleted)
     """
-    import stat
 
     host = sftp_config["host"]
     port = int(sftp_config.get("port", 22))
@@ -760,7 +866,6 @@ def clear_sftp_directory(sftp_config: Dict[str, Any], directory: str, use_shell:
     Returns:
         Tuple of (files_deleted, dirs_deleted)
     """
-    import stat
 
     host = sftp_config["host"]
     port = int(sftp_config.get("port", 22))
@@ -928,7 +1033,7 @@ def main():
 
     sftp_config = {"host": host, "port": port, "username": username, "password": password, "directory": directory}
 
-    if args.command == "check" or args.command is None:
+    def run_check():
         # Check SFTP connection
         try:
             print(f"Testing SFTP connection to {host}:{port} as {username}...")
@@ -938,7 +1043,7 @@ def main():
             print(f"❌ Connection failed: {str(e)}")
             exit(1)
 
-    elif args.command == "upload":
+    def run_upload():
         try:
             print(f"Uploading {args.gcs_uri} to SFTP at {host}:{port}{directory}/{args.remote_file}")
             upload_from_gcs(sftp_config, args.gcs_uri, args.remote_file)
@@ -947,7 +1052,7 @@ def main():
             print(f"❌ Upload failed: {str(e)}")
             exit(1)
 
-    elif args.command == "ls":
+    def run_ls():
         try:
             entries = list_sftp_directory(sftp_config, directory, long_format=args.long)
             if not entries:
@@ -975,7 +1080,7 @@ def main():
             print(f"❌ Failed to list directory: {str(e)}")
             exit(1)
 
-    elif args.command == "tree":
+    def run_tree():
         try:
             print(f"Directory tree for {host}:{port}")
             list_sftp_tree(sftp_config, directory, max_depth=args.depth)
@@ -983,7 +1088,7 @@ def main():
             print(f"❌ Failed to show tree: {str(e)}")
             exit(1)
 
-    elif args.command == "rm":
+    def run_rm():
         target_path = args.path
         # Confirmation prompt unless --force
         if not args.force:
@@ -1010,7 +1115,7 @@ def main():
             print(f"❌ Delete failed: {str(e)}")
             exit(1)
 
-    elif args.command == "clear":
+    def run_clear():
         # Confirmation prompt unless --force
         if not args.force:
             # Show what will be deleted first
@@ -1049,6 +1154,17 @@ def main():
             print(f"❌ Clear failed: {str(e)}")
             exit(1)
 
+    # Dispatch to the subcommand handler; no subcommand means 'check'
+    commands = {
+        "check": run_check,
+        "upload": run_upload,
+        "ls": run_ls,
+        "tree": run_tree,
+        "rm": run_rm,
+        "clear": run_clear,
+    }
+    commands[args.command or "check"]()
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
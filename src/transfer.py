@@ -3,27 +3,52 @@ GCS to SFTP transfer logic.
 """
 
 import fnmatch
+import re
 import time
 from pathlib import PurePosixPath
 from typing import Any, Dict, List, Optional, Tuple
 
 from google.cloud import storage
 
-from src.helpers import cprint
-from src.sftp import check_sftp_credentials, upload_from_gcs, upload_from_gcs_sequential
+from src.helpers import cprint, get_storage_client
+from src.sftp import (
+    checked_sftp_session,
+    upload_from_gcs_parallel,
+    upload_from_gcs_sequential,
+)
+
+# Callers only read blob name and size, so skip the rest of each object's metadata
+_LIST_FIELDS = "items(name,size),nextPageToken"
+
+# Characters that are literal to fnmatch/prefixes but glob syntax in GCS match_glob
+_GLOB_UNSAFE = frozenset("*?[]{},\\")
 
 
 def _parse_gcs_url(url: str) -> Tuple[str, str]:
     """Split gs://bucket/path into (bucket, path)."""
-    if not url.startswith("gs://"):
+    scheme, sep, rest = url.partition("://")
+    if scheme != "gs" or not sep:
         raise ValueError(f"Invalid GCS URL: {url}")
-    path = url[5:]
-    parts = path.split("/", 1)
-    bucket = parts[0]
-    prefix = parts[1] if len(parts) > 1 else ""
+    bucket, _, prefix = rest.partition("/")
     return bucket, prefix
 
 
+def _filename_glob(prefix: str, name_pattern: str) -> Optional[str]:
+    """
+    Build a match_glob for blobs under prefix whose filename matches name_pattern.
+
+    A GCS * does not cross "/", so the pattern is matched both directly under
+    prefix and in any subdirectory, like the client-side filename filter.
+    Returns None when prefix or name_pattern can't be expressed as a GCS glob
+    with the same meaning.
+    """
+    if (prefix and not prefix.endswith("/")) or "/" in name_pattern:
+        return None
+    if _GLOB_UNSAFE.intersection(prefix) or _GLOB_UNSAFE.difference("*?").intersection(name_pattern):
+        return None
+    return f"{prefix}{{{name_pattern},**/{name_pattern}}}"
+
+
 def _list_gcs_files(
     storage_client: storage.Client,
     gcs_path: str,
@@ -41,28 +66,28 @@ def _list_gcs_files(
         List of matching blobs
     """
     bucket_name, prefix = _parse_gcs_url(gcs_path)
-
-    # Check if path contains wildcard
-    if "*" in prefix:
-        # Extract prefix up to the wildcard
-        star_idx = prefix.find("*")
-        slash_idx = prefix.rfind("/", 0, star_idx)
-        actual_prefix = prefix[: slash_idx + 1] if slash_idx != -1 else ""
-        filter_pattern = prefix[slash_idx + 1 :] if slash_idx != -1 else prefix
-    else:
-        actual_prefix = prefix
-        filter_pattern = pattern
-
     bucket = storage_client.bucket(bucket_name)
-    blobs = list(bucket.list_blobs(prefix=actual_prefix))
 
-    # Filter out "directory" blobs (ending with /)
-    blobs = [b for b in blobs if not b.name.endswith("/")]
+    # A wildcard path lists the directory before the first * and matches the
+    # rest against filenames; GCS does the matching when it can express it
+    if "*" in prefix:
+        slash_idx = prefix.rfind("/", 0, prefix.find("*"))
+        prefix, pattern = prefix[: slash_idx + 1], prefix[slash_idx + 1 :]
+        glob = _filename_glob(prefix, pattern)
+        if glob is not None:
+            blobs = bucket.list_blobs(prefix=prefix, match_glob=glob, fields=_LIST_FIELDS)
+            return [b for b in blobs if not b.name.endswith("/")]
 
-    if filter_pattern:
-        blobs = [b for b in blobs if fnmatch.fnmatchcase(b.name.split("/")[-1], filter_pattern)]
+    # Translate the filename pattern once rather than per blob
+    match = re.compile(fnmatch.translate(pattern)).match if pattern else None
 
-    return blobs
+    # Filter while paging through results instead of materializing the full
+    # listing first; skip "directory" blobs (ending with /)
+    return [
+        b
+        for b in bucket.list_blobs(prefix=prefix, fields=_LIST_FIELDS)
+        if not b.name.endswith("/") and (match is None or match(b.name.rpartition("/")[2]))
+    ]
 
 
 def transfer_gcs_to_sftp(
@@ -73,11 +98,15 @@ def transfer_gcs_to_sftp(
     """
     Transfer files from GCS to SFTP.
 
+    The SFTP connection opened for the credential check is reused for the
+    uploads. If the SFTP config sets max_workers > 1 and there are several
+    files, they are uploaded in parallel and that connection serves one of
+    the workers.
+
     Args:
         sftp_config: SFTP connection configuration
         gcs_path: GCS path (gs://bucket/prefix/ or gs://bucket/prefix/*.csv.gz)
         export_name: Name of the export (for logging)
-        max_workers: Max parallel upload threads
 
     Returns:
         Result dictionary with transfer details
@@ -91,46 +120,49 @@ def transfer_gcs_to_sftp(
         gcs_path=gcs_path,
     )
 
-    # Normalize SFTP directory path
-    sftp_config = {**sftp_config, "directory": str(PurePosixPath(sftp_config["directory"]))}
-
-    # Validate SFTP credentials before doing any work
-    check_sftp_credentials(sftp_config)
-
-    # List files in GCS
-    storage_client = storage.Client()
-    blobs = _list_gcs_files(storage_client, gcs_path)
-
-    if not blobs:
-        raise FileNotFoundError(f"No files found in GCS for export '{export_name}' at '{gcs_path}'")
-
-    total_bytes = sum(int(b.size or 0) for b in blobs)
-    cprint(
-        f"Found {len(blobs)} files to transfer",
-        severity="INFO",
-        export_name=export_name,
-        total_mb=f"{total_bytes / (1024 * 1024):.2f}",
-    )
-
-    # Build file mappings: (gcs_uri, remote_filename)
-    file_mappings = []
-    transferred_files = []
-
-    for blob in blobs:
-        gcs_uri = f"gs://{blob.bucket.name}/{blob.name}"
-        remote_filename = blob.name.split("/")[-1]  # GCS filename = SFTP filename
-        file_mappings.append((gcs_uri, remote_filename))
-        transferred_files.append(remote_filename)
+    # Normalize SFTP directory path; the config dict is shared across
+    # requests, so copy it only when normalizing actually changes the value
+    directory = str(PurePosixPath(sftp_config["directory"]))
+    if directory != sftp_config["directory"]:
+        sftp_config = {**sftp_config, "directory": directory}
+
+    # Validate SFTP credentials before doing any work. The checked session is
+    # reused for the uploads; with parallel uploads it serves one of the
+    # workers, so no more than max_workers sessions are open at once
+    with checked_sftp_session(sftp_config) as sftp:
+        # List files in GCS
+        storage_client = get_storage_client()
+        blobs = _list_gcs_files(storage_client, gcs_path)
+
+        if not blobs:
+            raise FileNotFoundError(f"No files found in GCS for export '{export_name}' at '{gcs_path}'")
+
+        total_bytes = sum(int(b.size or 0) for b in blobs)
+        cprint(
+            f"Found {len(blobs)} files to transfer",
+            severity="INFO",
+            export_name=export_name,
+            total_mb=f"{total_bytes / (1024 * 1024):.2f}",
+        )
+
+        # Build file mappings: (gcs_uri, remote_filename); GCS filename = SFTP filename.
+        # All blobs come from the same bucket listing
+        gs_prefix = f"gs://{blobs[0].bucket.name}/"
+        file_mappings = [(gs_prefix + blob.name, blob.name.rpartition("/")[2]) for blob in blobs]
+        transferred_files = [remote_filename for _, remote_filename in file_mappings]
+
+        # Upload to SFTP
+        max_workers = min(int(sftp_config.get("max_workers", 1)), len(file_mappings))
+        if max_workers > 1:
+            # Shards are independent, so overlap their network I/O
+            upload_from_gcs_parallel(sftp_config, file_mappings, max_workers=max_workers, sftp_client=sftp)
+        else:
+            # Reuse the session opened for the credential check
+            upload_from_gcs_sequential(sftp_config, file_mappings, sftp_client=sftp)
 
-    # Upload to SFTP
     if len(file_mappings) == 1:
-        gcs_uri, remote_filename = file_mappings[0]
-        upload_from_gcs(sftp_config, gcs_uri, remote_filename)
-        files_transferred = 1
-        destination = f"{sftp_config['directory']}/{remote_filename}"
+        destination = f"{sftp_config['directory']}/{file_mappings[0][1]}"
     else:
-        # Use sequential upload with single connection for reliability
-        files_transferred = upload_from_gcs_sequential(sftp_config, file_mappings)
         destination = f"{sftp_config['directory']}/"
 
     total_time = time.time() - overall_start
@@ -2,11 +2,10 @@
 Verification logic to ensure GCS and SFTP are in sync.
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List, Set
 
-from google.cloud import storage
-
-from src.helpers import cprint
+from src.helpers import cprint, get_storage_client
 from src.sftp import list_sftp_files
 from src.transfer import _list_gcs_files, _parse_gcs_url
 
@@ -34,12 +33,18 @@ def verify_gcs_sftp_sync(
         gcs_path=gcs_path,
     )
 
-    # Get files from GCS
-    storage_client = storage.Client()
-    gcs_blobs = _list_gcs_files(storage_client, gcs_path)
-    
-    # GCS filename = SFTP filename (no renaming)
-    gcs_files: Set[str] = {blob.name.split("/")[-1] for blob in gcs_blobs}
+    # The GCS and SFTP listings are independent blocking calls, so run them
+    # concurrently instead of paying both round-trip latencies in sequence
+    sftp_directory = sftp_config["directory"]
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        gcs_future = executor.submit(_list_gcs_files, get_storage_client(), gcs_path)
+        sftp_future = executor.submit(list_sftp_files, sftp_config, sftp_directory)
+        gcs_blobs = gcs_future.result()
+        sftp_file_info = sftp_future.result()
+
+    # GCS filename = SFTP filename (no renaming); keep sizes for comparison
+    gcs_file_sizes = {blob.name.rpartition("/")[2]: blob.size for blob in gcs_blobs}
+    gcs_files: Set[str] = set(gcs_file_sizes)
     
     cprint(
         f"Expecting {len(gcs_files)} files on SFTP",
@@ -49,15 +54,6 @@ def verify_gcs_sftp_sync(
         sample_expected=list(gcs_files)[:3] if gcs_files else [],
     )
 
-    # Get file sizes from GCS for comparison
-    gcs_file_sizes = {
-        blob.name.split("/")[-1]: blob.size
-        for blob in gcs_blobs
-    }
-
-    # Get files from SFTP
-    sftp_directory = sftp_config["directory"]
-    sftp_file_info = list_sftp_files(sftp_config, sftp_directory)
     sftp_files: Set[str] = set(sftp_file_info.keys())
 
     # Filter SFTP files to only those that match GCS filenames
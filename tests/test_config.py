@@ -6,7 +6,7 @@ from unittest.mock import mock_open, patch
 
 import pytest
 
-from src.config import ConfigError, load_config
+from src.config import ConfigError, get_config, load_config
 
 
 def test_load_config_from_file():
@@ -70,6 +70,25 @@ def test_load_config_from_env_vars():
         assert config["gcs"]["bucket"] == "test-bucket"
 
 
+def test_load_config_from_env_vars_defaults():
+    """Test that env-var-only config falls back to default port, directory and expiration."""
+    env_vars = {
+        "SFTP_HOST": "sftp.example.com",
+        "SFTP_USERNAME": "user",
+        "SFTP_PASSWORD": "pass",
+    }
+
+    with patch.dict(os.environ, env_vars, clear=True):
+        config = load_config()
+        assert config["sftp"]["port"] == 22
+        assert config["sftp"]["directory"] == "/"
+        assert config["gcs"]["expiration_days"] == 30
+
+        # Mutating the result must not leak into the next load
+        config["sftp"]["port"] = 2222
+        assert load_config()["sftp"]["port"] == 22
+
+
 def test_validate_config_missing_sftp():
     """Test validation fails when sftp section is missing."""
     config = {"gcs": {"bucket": "test"}}
@@ -148,3 +167,24 @@ def test_gcs_expiration_days_default():
         with patch("builtins.open", mock_open(read_data=json.dumps(config))):
             result = load_config("fake_config.json")
             assert result["gcs"]["expiration_days"] == 30
+
+
+def test_get_config_reuses_result_until_env_changes():
+    """Test that get_config caches by source fingerprint."""
+    env_vars = {
+        "SFTP_HOST": "sftp.example.com",
+        "SFTP_USERNAME": "user",
+        "SFTP_PASSWORD": "pass",
+    }
+
+    with patch.dict(os.environ, env_vars, clear=True):
+        with patch("src.config.load_config", wraps=load_config) as mock_load:
+            first = get_config()
+            second = get_config()
+            assert first is second
+            assert mock_load.call_count == 1
+
+            os.environ["SFTP_DIRECTORY"] = "/changed"
+            third = get_config()
+            assert third["sftp"]["directory"] == "/changed"
+            assert mock_load.call_count == 2
@@ -0,0 +1,68 @@
+"""Tests for the EXPORT DATA helpers in the Airflow DAG and the local export script."""
+
+import importlib.util
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+REPO_ROOT = Path(__file__).parent.parent
+
+
+def load_module(name, path):
+    """Load a module from a file outside the src package."""
+    spec = importlib.util.spec_from_file_location(name, REPO_ROOT / path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="module", params=["script", "dag"])
+def export_module(request):
+    """
+    Load scripts/test_bq_export.py or the DAG, which keep mirrored copies of the helpers.
+
+    The DAG is parsed against the example config, as the scheduler would, and
+    is skipped when Airflow is not installed.
+    """
+    if request.param == "script":
+        return load_module("test_bq_export_script", "scripts/test_bq_export.py")
+
+    pytest.importorskip("airflow.decorators")
+    pytest.importorskip("airflow.providers.google.cloud.hooks.bigquery")
+    with patch.dict(os.environ, {"SFTP_EXPORT_CONFIG_PATH": str(REPO_ROOT / "configs/exports.json")}):
+        return load_module("sftp_export_dag", "airflow/dags/sftp_export_dag.py")
+
+
+def test_get_file_extension(export_module):
+    """Test that whole-file compression adds a suffix and AVRO never does."""
+    assert export_module.get_file_extension("CSV", "GZIP") == "csv.gz"
+    assert export_module.get_file_extension("PARQUET", "SNAPPY") == "parquet.snappy"
+    assert export_module.get_file_extension("JSON", "NONE") == "json"
+    assert export_module.get_file_extension("AVRO", "SNAPPY") == "avro"
+
+
+def test_build_export_query_csv(export_module):
+    """Test that CSV exports get header and field_delimiter options."""
+    sql = export_module.build_export_query("SELECT 1", "bucket", "sales", "20250108", "CSV", "GZIP")
+
+    assert "uri='gs://bucket/sales/20250108/sales_20250108-*.csv.gz'" in sql
+    assert "format='CSV'" in sql
+    assert "compression='GZIP'" in sql
+    assert "header=true" in sql
+    assert "field_delimiter='|'" in sql
+    assert sql.endswith(") AS\nSELECT 1")
+
+
+def test_build_export_query_avro_defaults(export_module):
+    """Test that AVRO exports default to SNAPPY, keep a plain extension and skip CSV-only options."""
+    compression = export_module.get_default_compression("avro")
+    sql = export_module.build_export_query("SELECT 1", "bucket", "sales", "20250108", "AVRO", compression)
+
+    assert compression == "SNAPPY"
+    assert export_module.get_default_compression("CSV") == "GZIP"
+    assert "uri='gs://bucket/sales/20250108/sales_20250108-*.avro'" in sql
+    assert "compression='SNAPPY'" in sql
+    assert "header" not in sql
+    assert "field_delimiter" not in sql
@@ -4,7 +4,7 @@ import json
 import re
 from unittest.mock import patch
 
-from src.helpers import cprint
+from src.helpers import cprint, get_storage_client
 
 
 def test_cprint_formats_json_output():
@@ -72,3 +72,27 @@ def test_cprint_default_severity():
         cprint("Test message")
         output = json.loads(mock_print.call_args[0][0])
         assert output["severity"] == "DEBUG"
+
+
+def test_cprint_drops_entries_below_log_level():
+    """Test that entries below the LOG_LEVEL threshold are not printed."""
+    with patch("builtins.print") as mock_print, patch("src.helpers._MIN_SEVERITY", 20):
+        cprint("Debug message")
+        mock_print.assert_not_called()
+
+        cprint("Info message", severity="info")
+        assert json.loads(mock_print.call_args[0][0])["message"] == "Info message"
+
+
+def test_get_storage_client_is_cached():
+    """Test that the GCS client is created once and reused."""
+    get_storage_client.cache_clear()
+    try:
+        with patch("google.cloud.storage.Client") as mock_client:
+            first = get_storage_client()
+            second = get_storage_client()
+
+            assert first is second
+            mock_client.assert_called_once_with()
+    finally:
+        get_storage_client.cache_clear()
@@ -0,0 +1,46 @@
+"""Tests for the Cloud Run HTTP endpoints."""
+
+import pytest
+
+from server import app
+
+
+@pytest.fixture
+def client():
+    """Create a Flask test client."""
+    app.config["TESTING"] = True
+    with app.test_client() as client:
+        yield client
+
+
+@pytest.mark.parametrize("endpoint", ["/transfer", "/verify"])
+def test_empty_payload_returns_400(client, endpoint):
+    """Test that both endpoints reject an empty JSON payload."""
+    response = client.post(endpoint, json={})
+
+    assert response.status_code == 400
+    assert response.get_json() == {"status": "error", "message": "No JSON payload"}
+
+
+@pytest.mark.parametrize(
+    "payload, message",
+    [
+        ({"gcs_path": "gs://bucket/exports/"}, "Missing export_name"),
+        ({"export_name": "test_export"}, "Missing gcs_path"),
+    ],
+)
+def test_transfer_missing_field_returns_400(client, payload, message):
+    """Test that /transfer names the missing field."""
+    response = client.post("/transfer", json=payload)
+
+    assert response.status_code == 400
+    assert response.get_json() == {"status": "error", "message": message}
+
+
+@pytest.mark.parametrize("payload", [{"gcs_path": "gs://bucket/exports/"}, {"export_name": "test_export"}])
+def test_verify_missing_field_returns_400(client, payload):
+    """Test that /verify keeps its combined missing-field message."""
+    response = client.post("/verify", json=payload)
+
+    assert response.status_code == 400
+    assert response.get_json() == {"status": "error", "message": "Missing export_name or gcs_path"}
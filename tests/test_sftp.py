@@ -1,17 +1,28 @@
 """Tests for SFTP operations."""
 
+import base64
+import concurrent.futures
+import io
+import stat
+import threading
 from pathlib import PurePosixPath
 from unittest.mock import MagicMock, patch
 
+import google_crc32c
 import paramiko
 import pytest
+from tenacity import stop_after_attempt
 
 from src.config import ConfigError
+from src.helpers import get_storage_client
 from src.sftp import (
+    _download_and_upload,
     check_sftp_credentials,
+    checked_sftp_session,
     create_sftp_connection,
     ensure_sftp_directory,
     parse_gcs_uri,
+    sftp_session,
     upload_from_gcs,
     upload_from_gcs_parallel,
 )
@@ -51,6 +62,11 @@ def test_parse_gcs_uri_invalid():
         parse_gcs_uri("gs://bucket-name")
 
 
+def crc32c_b64(data):
+    """Return data's CRC32C in the base64 form GCS reports."""
+    return base64.b64encode(google_crc32c.Checksum(data).digest()).decode()
+
+
 @pytest.fixture
 def mock_sftp_connection():
     """Create mocks for SFTP connection."""
@@ -62,6 +78,14 @@ def mock_sftp_connection():
         yield mock_transport, mock_sftp
 
 
+@pytest.fixture(autouse=True)
+def reset_storage_client():
+    """Drop the cached GCS client so each test sees its own storage mock."""
+    get_storage_client.cache_clear()
+    yield
+    get_storage_client.cache_clear()
+
+
 @pytest.fixture
 def mock_gcs():
     """Create mocks for Google Cloud Storage."""
@@ -72,6 +96,7 @@ def mock_gcs():
     mock_storage_client.bucket.return_value = mock_bucket
     mock_bucket.get_blob.return_value = mock_blob
     mock_blob.size = 1024 * 1024  # 1 MB
+    mock_blob.crc32c = None  # Tests that stream bytes set the real checksum
 
     with patch("src.sftp.storage.Client", return_value=mock_storage_client):
         yield mock_storage_client, mock_bucket, mock_blob
@@ -89,41 +114,69 @@ def sftp_config():
     }
 
 
-def test_upload_from_gcs(mock_sftp_connection, mock_gcs, sftp_config, tmp_path):
+def test_upload_from_gcs(mock_sftp_connection, mock_gcs, sftp_config):
     """Test uploading a file from GCS to SFTP."""
     mock_transport, mock_sftp = mock_sftp_connection
     _, _, mock_blob = mock_gcs
 
-    # Mock temporary file
-    with patch("src.sftp.tempfile.NamedTemporaryFile") as mock_temp_file:
-        mock_temp_file_instance = MagicMock()
-        mock_temp_file_instance.name = str(tmp_path / "temp_file")
-        mock_temp_file.return_value = mock_temp_file_instance
+    # Stream real bytes from the blob and report a matching remote size
+    payload = b"x" * mock_blob.size
+    mock_blob.crc32c = crc32c_b64(payload)
+    mock_blob.open.return_value.__enter__.return_value = io.BytesIO(payload)
+    remote_file = io.BytesIO()
+    remote_file.set_pipelined = MagicMock()
+    mock_sftp.open.return_value.__enter__.return_value = remote_file
+    mock_sftp.stat.return_value.st_size = mock_blob.size
+
+    with patch("src.sftp.cprint"):  # Silence logging
+        # Call the function being tested
+        upload_from_gcs(sftp_config, "gs://bucket-name/path/to/file.csv", "remote_file.csv")
+
+        # Verify the blob was streamed into the remote file without a temp file
+        mock_blob.open.assert_called_once_with("rb", chunk_size=8 * 1024 * 1024)
+        mock_sftp.open.assert_called_once_with("/remote/path/remote_file.csv", "wb")
+        remote_file.set_pipelined.assert_called_once_with(True)
+        assert remote_file.getvalue() == payload
+        mock_blob.download_to_filename.assert_not_called()
+        mock_sftp.put.assert_not_called()
+
+        # Verify the connection was closed
+        mock_sftp.close.assert_called_once()
+        mock_transport.close.assert_called_once()
+
+
+def test_download_and_upload_size_mismatch(mock_gcs):
+    """Test that a short remote file is reported as an IOError."""
+    _, _, mock_blob = mock_gcs
+    mock_sftp = MagicMock()
 
-        # Mock os.path.getsize to return file size
-        with patch("src.sftp.os.path.getsize", return_value=1024 * 1024):
-            # Mock os.path.exists and os.unlink for temp file cleanup
-            with patch("src.sftp.os.path.exists", return_value=True), patch(
-                "src.sftp.os.unlink"
-            ) as mock_unlink, patch(
-                "src.sftp.cprint"
-            ):  # Silence logging
+    mock_blob.open.return_value.__enter__.return_value = io.BytesIO(b"data")
+    mock_sftp.open.return_value.__enter__.return_value = MagicMock()
+    mock_sftp.stat.return_value.st_size = 4
 
-                # Call the function being tested
-                upload_from_gcs(sftp_config, "gs://bucket-name/path/to/file.csv", "remote_file.csv")
+    with patch("src.sftp.cprint"):
+        with pytest.raises(IOError, match="Size mismatch"):
+            _download_and_upload.retry_with(stop=stop_after_attempt(1), reraise=True)(
+                mock_sftp, mock_blob, "/remote/path/file.csv"
+            )
 
-                # Verify the temporary file was created and cleaned up
-                mock_unlink.assert_called_once_with(mock_temp_file_instance.name)
 
-                # Verify the file was uploaded to SFTP
-                mock_sftp.put.assert_called_once_with(mock_temp_file_instance.name, "/remote/path/remote_file.csv")
+def test_download_and_upload_checksum_mismatch(mock_gcs):
+    """Test that bytes corrupted in transit are reported as an IOError."""
+    _, _, mock_blob = mock_gcs
+    mock_sftp = MagicMock()
 
-                # Verify the blob was downloaded
-                mock_blob.download_to_filename.assert_called_once_with(mock_temp_file_instance.name)
+    mock_blob.size = 4
+    mock_blob.crc32c = crc32c_b64(b"data")
+    mock_blob.open.return_value.__enter__.return_value = io.BytesIO(b"dat4")
+    mock_sftp.open.return_value.__enter__.return_value = MagicMock()
+    mock_sftp.stat.return_value.st_size = 4
 
-                # Verify the connection was closed
-                mock_sftp.close.assert_called_once()
-                mock_transport.close.assert_called_once()
+    with patch("src.sftp.cprint"):
+        with pytest.raises(IOError, match="CRC32C mismatch"):
+            _download_and_upload.retry_with(stop=stop_after_attempt(1), reraise=True)(
+                mock_sftp, mock_blob, "/remote/path/file.csv"
+            )
 
 
 def test_upload_from_gcs_with_gcs_error(mock_sftp_connection, mock_gcs, sftp_config):
@@ -166,14 +219,63 @@ def test_ensure_sftp_directory_create(mock_sftp_connection):
 
     mock_sftp.stat.side_effect = mock_stat_side_effect
 
+    # mkdir() fails until the parent directory has been created
+    created = {"/"}
+
+    def mock_mkdir_side_effect(path):
+        if str(PurePosixPath(path).parent) not in created:
+            raise FileNotFoundError("No such file")
+        created.add(path)
+
+    mock_sftp.mkdir.side_effect = mock_mkdir_side_effect
+
     with patch("src.sftp.cprint"):
         ensure_sftp_directory(mock_sftp, PurePosixPath("/new/nested/dir"))
 
-        # Should have tried to create each directory in the path
-        assert mock_sftp.mkdir.call_count == 3
-        mock_sftp.mkdir.assert_any_call("/new")
-        mock_sftp.mkdir.assert_any_call("/new/nested")
-        mock_sftp.mkdir.assert_any_call("/new/nested/dir")
+        # Should have created each directory in the path
+        assert created == {"/", "/new", "/new/nested", "/new/nested/dir"}
+        mock_sftp.stat.assert_called_once_with("/new/nested/dir")
+
+
+def test_ensure_sftp_directory_created_concurrently():
+    """Test that a directory created by another connection mid-way counts as success."""
+    mock_sftp = MagicMock()
+
+    # Another worker creates /new/dir between our parent mkdir and our retry
+    mock_sftp.stat.side_effect = [FileNotFoundError("Directory not found"), MagicMock(st_mode=stat.S_IFDIR | 0o755)]
+    mock_sftp.mkdir.side_effect = [FileNotFoundError("No such file"), None, IOError("Failure")]
+
+    with patch("src.sftp.cprint"):
+        ensure_sftp_directory(mock_sftp, PurePosixPath("/new/dir"))
+
+    assert [c.args[0] for c in mock_sftp.mkdir.call_args_list] == ["/new/dir", "/new", "/new/dir"]
+    mock_sftp.stat.assert_called_with("/new/dir")
+
+
+def test_ensure_sftp_directory_rejects_existing_file():
+    """Test that a file in the way of the directory is still an error."""
+    mock_sftp = MagicMock()
+    mock_sftp.stat.side_effect = [FileNotFoundError("Directory not found"), MagicMock(st_mode=stat.S_IFREG | 0o644)]
+    mock_sftp.mkdir.side_effect = IOError("Failure")
+
+    with patch("src.sftp.cprint"):
+        with pytest.raises(IOError, match="Failure"):
+            ensure_sftp_directory(mock_sftp, PurePosixPath("/new/dir"))
+
+
+def test_ensure_sftp_directory_cached_per_connection():
+    """Test that a directory is only checked once per SFTP connection."""
+    mock_sftp = MagicMock()
+    other_sftp = MagicMock()
+
+    with patch("src.sftp.cprint"):
+        ensure_sftp_directory(mock_sftp, PurePosixPath("/remote/path"))
+        ensure_sftp_directory(mock_sftp, PurePosixPath("/remote/path"))
+        ensure_sftp_directory(mock_sftp, PurePosixPath("/remote"))
+        ensure_sftp_directory(other_sftp, PurePosixPath("/remote/path"))
+
+    mock_sftp.stat.assert_called_once_with("/remote/path")
+    other_sftp.stat.assert_called_once_with("/remote/path")
 
 
 def test_check_sftp_credentials(mock_sftp_connection):
@@ -216,6 +318,34 @@ def test_check_sftp_credentials_directory_not_found(mock_sftp_connection):
         mock_sftp.close.assert_called_once()
 
 
+def test_checked_sftp_session_stays_open(mock_sftp_connection, sftp_config):
+    """Test that the checked session is yielded open and closed on exit."""
+    mock_transport, mock_sftp = mock_sftp_connection
+    mock_sftp.listdir.return_value = []
+
+    with patch("src.sftp.cprint"):
+        with checked_sftp_session(sftp_config) as sftp:
+            assert sftp is mock_sftp
+            mock_sftp.listdir.assert_called_once_with("/remote/path")
+            mock_sftp.close.assert_not_called()
+
+    mock_sftp.close.assert_called_once()
+    mock_transport.close.assert_called_once()
+
+
+def test_checked_sftp_session_does_not_convert_block_errors(mock_sftp_connection, sftp_config):
+    """Test that errors raised inside the with-block are not reported as connection failures."""
+    mock_transport, mock_sftp = mock_sftp_connection
+
+    with patch("src.sftp.cprint"):
+        with pytest.raises(RuntimeError, match="boom"):
+            with checked_sftp_session(sftp_config):
+                raise RuntimeError("boom")
+
+    mock_sftp.close.assert_called_once()
+    mock_transport.close.assert_called_once()
+
+
 def test_check_sftp_credentials_connection_error():
     """Test handling connection errors when checking credentials."""
     with patch("src.sftp.create_sftp_connection") as mock_create_connection, patch("src.sftp.cprint"):
@@ -228,6 +358,158 @@ def test_check_sftp_credentials_connection_error():
             )
 
 
+def test_sftp_session_closes_on_error(mock_sftp_connection, sftp_config):
+    """Test that sftp_session closes the connection even when the block raises."""
+    mock_transport, mock_sftp = mock_sftp_connection
+
+    with pytest.raises(RuntimeError):
+        with sftp_session(sftp_config) as sftp:
+            assert sftp is mock_sftp
+            raise RuntimeError("boom")
+
+    mock_sftp.close.assert_called_once()
+    mock_transport.close.assert_called_once()
+
+
+def test_upload_from_gcs_parallel_reuses_worker_sessions(sftp_config):
+    """Test that each worker opens at most one connection for all its files."""
+    file_mappings = [(f"gs://bucket/file{i}.csv", f"remote{i}.csv") for i in range(6)]
+    connections = []
+
+    def fake_connection(*args):
+        connection = (MagicMock(), MagicMock())
+        connections.append(connection)
+        return connection
+
+    with patch("src.sftp.create_sftp_connection", side_effect=fake_connection), patch(
+        "src.sftp.upload_from_gcs"
+    ) as mock_upload, patch("src.sftp.cprint"):
+        result = upload_from_gcs_parallel(sftp_config, file_mappings, max_workers=2)
+
+    assert result == 6
+    assert mock_upload.call_count == 6
+    assert 1 <= len(connections) <= 2
+    for transport, sftp in connections:
+        sftp.close.assert_called_once()
+        transport.close.assert_called_once()
+
+
+def as_completed_after_all(futures):
+    """Hand back futures only once all have run, so a failure cancels nothing."""
+    concurrent.futures.wait(futures)
+    return list(futures)
+
+
+def test_upload_from_gcs_parallel_cancels_pending_after_failure(sftp_config):
+    """Test that the first failed file cancels uploads that have not started and is raised."""
+    file_mappings = [(f"gs://bucket/file{i}.csv", f"remote{i}.csv") for i in range(10)]
+    cancelled = threading.Event()
+
+    def fake_upload(sftp_config, gcs_uri, remote_filename, sftp_client):
+        if remote_filename == "remote0.csv":
+            raise ConfigError("SFTP upload failed: Permission denied")
+        # A file picked up before the cancel waits for it, so the rest stay queued
+        assert cancelled.wait(timeout=5)
+
+    def fake_cprint(message, **kwargs):
+        if message.startswith("Cancelled"):
+            cancelled.set()
+
+    with patch("src.sftp.create_sftp_connection", return_value=(MagicMock(), MagicMock())), patch(
+        "src.sftp.upload_from_gcs", side_effect=fake_upload
+    ) as mock_upload, patch("src.sftp.cprint", side_effect=fake_cprint):
+        with pytest.raises(Exception, match=r"file 1/10 \(remote0.csv\): SFTP upload failed: Permission denied"):
+            upload_from_gcs_parallel(sftp_config, file_mappings, max_workers=1)
+
+    assert cancelled.is_set()
+    assert mock_upload.call_count <= 2
+
+
+def test_upload_from_gcs_parallel_reconnects_after_failure(sftp_config):
+    """Test that a worker drops a failed session and opens a new one for its next file."""
+    file_mappings = [(f"gs://bucket/file{i}.csv", f"remote{i}.csv") for i in range(3)]
+    connections = []
+
+    def fake_connection(*args):
+        connection = (MagicMock(), MagicMock())
+        connections.append(connection)
+        return connection
+
+    def fake_upload(sftp_config, gcs_uri, remote_filename, sftp_client):
+        # The first connection's transport has dropped
+        if sftp_client is connections[0][1]:
+            raise ConfigError("SFTP upload failed: Socket is closed")
+
+    with patch("src.sftp.create_sftp_connection", side_effect=fake_connection), patch(
+        "src.sftp.upload_from_gcs", side_effect=fake_upload
+    ) as mock_upload, patch("src.sftp.concurrent.futures.as_completed", side_effect=as_completed_after_all), patch(
+        "src.sftp.cprint"
+    ):
+        with pytest.raises(Exception, match=r"file 1/3 \(remote0.csv\)"):
+            upload_from_gcs_parallel(sftp_config, file_mappings, max_workers=1)
+
+    assert len(connections) == 2
+    assert [call.kwargs["sftp_client"] for call in mock_upload.call_args_list] == [
+        connections[0][1],
+        connections[1][1],
+        connections[1][1],
+    ]
+    for transport, sftp in connections:
+        sftp.close.assert_called_once()
+        transport.close.assert_called_once()
+
+
+def test_upload_from_gcs_parallel_keeps_supplied_client_open_after_failure(sftp_config):
+    """Test that a failed caller-supplied client is dropped but not closed."""
+    file_mappings = [(f"gs://bucket/file{i}.csv", f"remote{i}.csv") for i in range(2)]
+    supplied_sftp = MagicMock()
+    connections = []
+
+    def fake_connection(*args):
+        connection = (MagicMock(), MagicMock())
+        connections.append(connection)
+        return connection
+
+    def fake_upload(sftp_config, gcs_uri, remote_filename, sftp_client):
+        if sftp_client is supplied_sftp:
+            raise ConfigError("SFTP upload failed: Socket is closed")
+
+    with patch("src.sftp.create_sftp_connection", side_effect=fake_connection), patch(
+        "src.sftp.upload_from_gcs", side_effect=fake_upload
+    ), patch("src.sftp.concurrent.futures.as_completed", side_effect=as_completed_after_all), patch(
+        "src.sftp.cprint"
+    ):
+        with pytest.raises(Exception, match=r"file 1/2 \(remote0.csv\)"):
+            upload_from_gcs_parallel(sftp_config, file_mappings, max_workers=1, sftp_client=supplied_sftp)
+
+    assert len(connections) == 1
+    supplied_sftp.close.assert_not_called()
+
+
+def test_upload_from_gcs_parallel_uses_supplied_client(sftp_config):
+    """Test that a caller-supplied client serves one worker and is left open."""
+    file_mappings = [(f"gs://bucket/file{i}.csv", f"remote{i}.csv") for i in range(6)]
+    supplied_sftp = MagicMock()
+    connections = []
+
+    def fake_connection(*args):
+        connection = (MagicMock(), MagicMock())
+        connections.append(connection)
+        return connection
+
+    with patch("src.sftp.create_sftp_connection", side_effect=fake_connection), patch(
+        "src.sftp.upload_from_gcs"
+    ) as mock_upload, patch("src.sftp.cprint"):
+        result = upload_from_gcs_parallel(sftp_config, file_mappings, max_workers=2, sftp_client=supplied_sftp)
+
+    assert result == 6
+    # At most one extra connection for the second worker
+    assert len(connections) <= 1
+    used_clients = {call.kwargs["sftp_client"] for call in mock_upload.call_args_list}
+    assert supplied_sftp in used_clients
+    supplied_sftp.close.assert_not_called()
+
+
 def test_create_sftp_connection():
     """Test creating SFTP connection."""
     mock_transport = MagicMock()
@@ -253,7 +535,7 @@ def test_create_sftp_connection():
 
 # For the methods that call _download_and_upload internally, make sure we're mocking that
 @patch("src.sftp._download_and_upload")
-def test_upload_from_gcs_fully_mocked(mock_download_upload, mock_sftp_connection, mock_gcs, sftp_config, tmp_path):
+def test_upload_from_gcs_fully_mocked(mock_download_upload, mock_sftp_connection, mock_gcs, sftp_config):
     """Test uploading a file from GCS to SFTP with everything fully mocked."""
     mock_transport, mock_sftp = mock_sftp_connection
     mock_storage_client, mock_bucket, mock_blob = mock_gcs
@@ -261,13 +543,7 @@ def test_upload_from_gcs_fully_mocked(mock_download_upload, mock_sftp_connection
     # Use a regular patch instead of autospec=True which causes issues
     with patch("src.sftp.storage.Client", return_value=mock_storage_client), patch(
         "src.sftp.time.time", return_value=100.0
-    ), patch("src.sftp.tempfile.NamedTemporaryFile"), patch("src.sftp.os.path.exists", return_value=True), patch(
-        "src.sftp.os.path.getsize", return_value=1024
-    ), patch(
-        "src.sftp.os.unlink"
-    ), patch(
-        "src.sftp.cprint"
-    ):
+    ), patch("src.sftp.cprint"):
 
         # Call the function
         upload_from_gcs(sftp_config, "gs://bucket-name/path/to/file.csv", "remote_file.csv")
@@ -0,0 +1,127 @@
+"""Tests for GCS to SFTP transfer logic."""
+
+from contextlib import nullcontext
+from unittest.mock import MagicMock, patch
+
+import paramiko
+import pytest
+
+from src.config import ConfigError
+from src.transfer import _list_gcs_files, transfer_gcs_to_sftp
+
+
+def make_blob(name, size=100, bucket="bucket"):
+    """Create a mock blob as returned by a GCS listing."""
+    blob = MagicMock()
+    blob.name = name
+    blob.size = size
+    blob.bucket.name = bucket
+    return blob
+
+
+@pytest.fixture
+def sftp_config():
+    """Create a sample SFTP configuration."""
+    return {
+        "host": "sftp.example.com",
+        "port": 22,
+        "username": "testuser",
+        "password": "testpass",
+        "directory": "/remote/path",
+    }
+
+
+def test_list_gcs_files_wildcard_uses_match_glob():
+    """Test that a wildcard path is matched server-side against filenames at any depth."""
+    mock_client = MagicMock()
+    mock_bucket = mock_client.bucket.return_value
+    mock_bucket.list_blobs.return_value = [
+        make_blob("exports/run1/shard-000.csv.gz"),
+        make_blob("exports/run1/nested/shard-001.csv.gz"),
+        make_blob("exports/run1/dir.csv.gz/"),
+    ]
+
+    blobs = _list_gcs_files(mock_client, "gs://bucket/exports/run1/*.csv.gz")
+
+    mock_client.bucket.assert_called_once_with("bucket")
+    mock_bucket.list_blobs.assert_called_once_with(
+        prefix="exports/run1/",
+        match_glob="exports/run1/{*.csv.gz,**/*.csv.gz}",
+        fields="items(name,size),nextPageToken",
+    )
+    assert [b.name for b in blobs] == ["exports/run1/shard-000.csv.gz", "exports/run1/nested/shard-001.csv.gz"]
+
+
+def test_list_gcs_files_wildcard_with_glob_syntax_matches_client_side():
+    """Test that braces in a wildcard path stay literal, as with the filename filter."""
+    mock_client = MagicMock()
+    mock_bucket = mock_client.bucket.return_value
+    mock_bucket.list_blobs.return_value = [
+        make_blob("exports/{a,b}-000.csv"),
+        make_blob("exports/sub/{a,b}-001.csv"),
+        make_blob("exports/a-002.csv"),
+    ]
+
+    blobs = _list_gcs_files(mock_client, "gs://bucket/exports/{a,b}-*.csv")
+
+    mock_bucket.list_blobs.assert_called_once_with(prefix="exports/", fields="items(name,size),nextPageToken")
+    assert [b.name for b in blobs] == ["exports/{a,b}-000.csv", "exports/sub/{a,b}-001.csv"]
+
+
+def test_transfer_reports_connection_failure_as_config_error(sftp_config):
+    """Test that a failed SFTP login surfaces as ConfigError before GCS is listed."""
+    with patch(
+        "src.sftp.create_sftp_connection",
+        side_effect=paramiko.ssh_exception.AuthenticationException("Auth failed"),
+    ), patch("src.transfer._list_gcs_files") as mock_list, patch("src.sftp.cprint"), patch("src.transfer.cprint"):
+        with pytest.raises(ConfigError, match="SFTP connection failed"):
+            transfer_gcs_to_sftp(sftp_config, "gs://bucket/exports/", "test_export")
+
+    mock_list.assert_not_called()
+
+
+@pytest.fixture
+def mock_transfer_deps():
+    """Mock the checked SFTP session, GCS listing and upload functions used by transfer_gcs_to_sftp."""
+    mock_sftp = MagicMock()
+    blobs = [make_blob("exports/run1/shard-000.csv.gz"), make_blob("exports/run1/shard-001.csv.gz")]
+
+    with patch("src.transfer.checked_sftp_session", return_value=nullcontext(mock_sftp)), patch(
+        "src.transfer.get_storage_client"
+    ), patch("src.transfer._list_gcs_files", return_value=blobs), patch(
+        "src.transfer.upload_from_gcs_sequential"
+    ) as mock_sequential, patch(
+        "src.transfer.upload_from_gcs_parallel"
+    ) as mock_parallel, patch(
+        "src.transfer.cprint"
+    ):
+        yield mock_sftp, mock_sequential, mock_parallel
+
+
+EXPECTED_MAPPINGS = [
+    ("gs://bucket/exports/run1/shard-000.csv.gz", "shard-000.csv.gz"),
+    ("gs://bucket/exports/run1/shard-001.csv.gz", "shard-001.csv.gz"),
+]
+
+
+def test_transfer_sequential_reuses_checked_session(mock_transfer_deps, sftp_config):
+    """Test that sequential uploads run over the session opened for the credential check."""
+    mock_sftp, mock_sequential, mock_parallel = mock_transfer_deps
+
+    result = transfer_gcs_to_sftp(sftp_config, "gs://bucket/exports/run1/", "test_export")
+
+    mock_sequential.assert_called_once_with(sftp_config, EXPECTED_MAPPINGS, sftp_client=mock_sftp)
+    mock_parallel.assert_not_called()
+    assert result["files"] == ["shard-000.csv.gz", "shard-001.csv.gz"]
+    assert result["destination"] == "/remote/path/"
+
+
+def test_transfer_parallel_hands_checked_session_to_workers(mock_transfer_deps, sftp_config):
+    """Test that max_workers > 1 uploads in parallel, capped at the file count."""
+    mock_sftp, mock_sequential, mock_parallel = mock_transfer_deps
+    sftp_config["max_workers"] = 4
+
+    transfer_gcs_to_sftp(sftp_config, "gs://bucket/exports/run1/", "test_export")
+
+    mock_parallel.assert_called_once_with(sftp_config, EXPECTED_MAPPINGS, max_workers=2, sftp_client=mock_sftp)
+    mock_sequential.assert_not_called()
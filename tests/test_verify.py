@@ -0,0 +1,91 @@
+"""Tests for GCS/SFTP sync verification."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.verify import verify_gcs_sftp_sync
+
+
+def make_blob(name, size):
+    """Create a mock blob as returned by a GCS listing."""
+    blob = MagicMock()
+    blob.name = name
+    blob.size = size
+    return blob
+
+
+@pytest.fixture
+def sftp_config():
+    """Create a sample SFTP configuration."""
+    return {
+        "host": "sftp.example.com",
+        "port": 22,
+        "username": "testuser",
+        "password": "testpass",
+        "directory": "/remote/path",
+    }
+
+
+@pytest.fixture
+def mock_listings():
+    """Mock the GCS and SFTP listings used by verify_gcs_sftp_sync."""
+    with patch("src.verify.get_storage_client"), patch("src.verify._list_gcs_files") as mock_gcs, patch(
+        "src.verify.list_sftp_files"
+    ) as mock_sftp, patch("src.verify.cprint"):
+        mock_gcs.return_value = [make_blob("exports/run1/a.csv.gz", 10), make_blob("exports/run1/b.csv.gz", 20)]
+        yield mock_gcs, mock_sftp
+
+
+def test_verify_in_sync(mock_listings, sftp_config):
+    """Test that matching names and sizes are reported in sync, ignoring unrelated SFTP files."""
+    _, mock_sftp = mock_listings
+    mock_sftp.return_value = {"a.csv.gz": {"size": 10}, "b.csv.gz": {"size": 20}, "other.txt": {"size": 5}}
+
+    result = verify_gcs_sftp_sync(sftp_config, "gs://bucket/exports/run1/", "test_export")
+
+    mock_sftp.assert_called_once_with(sftp_config, "/remote/path")
+    assert result["in_sync"] is True
+    assert result["gcs_files"] == ["a.csv.gz", "b.csv.gz"]
+    assert result["sftp_files"] == ["a.csv.gz", "b.csv.gz"]
+    assert result["missing_on_sftp"] == []
+    assert result["size_mismatches"] == []
+
+
+def test_verify_missing_and_mismatched_files(mock_listings, sftp_config):
+    """Test that files missing on SFTP or with a different size fail verification."""
+    _, mock_sftp = mock_listings
+    mock_sftp.return_value = {"a.csv.gz": {"size": 9}}
+
+    result = verify_gcs_sftp_sync(sftp_config, "gs://bucket/exports/run1/", "test_export")
+
+    assert result["in_sync"] is False
+    assert result["missing_on_sftp"] == ["b.csv.gz"]
+    assert result["size_mismatches"] == [{"filename": "a.csv.gz", "gcs_size": 10, "sftp_size": 9}]
+
+
+def test_verify_no_gcs_files(mock_listings, sftp_config):
+    """Test that an empty GCS listing is never reported in sync."""
+    mock_gcs, mock_sftp = mock_listings
+    mock_gcs.return_value = []
+    mock_sftp.return_value = {}
+
+    result = verify_gcs_sftp_sync(sftp_config, "gs://bucket/exports/run1/", "test_export")
+
+    assert result["in_sync"] is False
+    assert result["no_files_found"] is True
+
+
+def test_verify_propagates_listing_error(mock_listings, sftp_config):
+    """Test that an exception from either concurrent listing reaches the caller."""
+    mock_gcs, mock_sftp = mock_listings
+    mock_sftp.side_effect = ConnectionError("SFTP down")
+
+    with pytest.raises(ConnectionError, match="SFTP down"):
+        verify_gcs_sftp_sync(sftp_config, "gs://bucket/exports/run1/", "test_export")
+
+    mock_sftp.side_effect = None
+    mock_gcs.side_effect = ValueError("Invalid GCS URL")
+
+    with pytest.raises(ValueError, match="Invalid GCS URL"):
+        verify_gcs_sftp_sync(sftp_config, "gs://bucket/exports/run1/", "test_export")